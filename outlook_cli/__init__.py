@@ -1,3 +1,10 @@
 """Outlook CLI - Microsoft Graph CLI for Outlook"""
 
 __version__ = "0.1.0"
+
+def __getattr__(name):
+    """Import the CLI only when it is first used"""
+    if name == "cli":
+        from outlook_cli.main import cli
+        return cli
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,8 @@
+"""
+Run Outlook CLI with python -m outlook_cli
+"""
+
+from outlook_cli.main import cli
+
+if __name__ == '__main__':
+    cli()
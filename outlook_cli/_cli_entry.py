@@ -0,0 +1,18 @@
+"""
+Console script target for the outlook command
+Answers --version without importing click; everything else goes to main
+"""
+
+import sys
+
+from outlook_cli import __version__
+
+def main():
+    """Run the outlook command"""
+    # Same text as click's version_option on the cli group
+    if sys.argv[1:] in (['--version'], ['-V']):
+        print(f"outlook, version {__version__}")
+        return 0
+    
+    from outlook_cli.main import cli
+    return cli()
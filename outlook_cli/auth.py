@@ -3,9 +3,16 @@ Authentication manager for Outlook CLI
 Handles device code flow, token storage, and refresh
 """
 
-import json
+# PEP 810 lazy imports on Python 3.15+. The keyring probe below relies on
+# ImportError at import time, so keyring must not be listed
+__lazy_modules__ = ["asyncio", "base64", "binascii"]
+
+import asyncio
+import base64
+import binascii
+import orjson
+import os
 import time
-import requests
 from pathlib import Path
 from datetime import datetime, timedelta
 import click
@@ -19,38 +26,71 @@ except ImportError:
 
 KEYRING_SERVICE = "outlook-cli"
 TOKEN_FILE = "tokens.json"
+TASKLIST_CACHE_FILE = "tasklists.json"
+REFRESH_MARGIN = 300  # Refresh 5 min early
+DEFAULT_TOKEN_LIFETIME = 3600
+
+def _email_from_jwt(token: str):
+    """Read the account email from a JWT access token's claims, or None if unavailable"""
+    try:
+        payload = token.split('.')[1]
+        claims = orjson.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+    except (IndexError, ValueError, binascii.Error):
+        # Not a JWT (personal account tokens are often opaque)
+        return None
+    if not isinstance(claims, dict):
+        return None
+    return claims.get('preferred_username') or claims.get('upn') or claims.get('email')
+
+def _write_private(path: Path, data: bytes):
+    """Write a file in one go, creating it readable by the owner only"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
 
 class AuthManager:
     def __init__(self, config_dir: Path):
         self.config_dir = config_dir
         self.token_file = config_dir / TOKEN_FILE
         self.config_file = config_dir / "config.json"
+        self._tokens_cache = None
+        self._tokens_mtime = -1
+        self._refresh_locks = {}  # email -> asyncio.Lock
+        self._refresh_tasks = {}  # email -> background refresh task
+        self._refresh_timers = {}  # email -> scheduled background refresh
     
     def _load_config(self):
         """Load configuration"""
         if self.config_file.exists():
-            with open(self.config_file) as f:
-                return json.load(f)
+            return orjson.loads(self.config_file.read_bytes())
         return {}
     
     def _save_config(self, config):
         """Save configuration"""
-        with open(self.config_file, 'w') as f:
-            json.dump(config, f, indent=2)
+        _write_private(self.config_file, orjson.dumps(config, option=orjson.OPT_INDENT_2))
     
     def _load_tokens(self):
-        """Load tokens from storage"""
-        if self.token_file.exists():
-            with open(self.token_file) as f:
-                return json.load(f)
-        return {}
+        """Load tokens from storage, reparsing only when the file changes"""
+        try:
+            mtime = self.token_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        
+        if mtime != self._tokens_mtime:
+            self._tokens_cache = orjson.loads(self.token_file.read_bytes())
+            self._tokens_mtime = mtime
+        return self._tokens_cache
     
     def _save_tokens(self, tokens):
         """Save tokens to storage"""
-        with open(self.token_file, 'w') as f:
-            json.dump(tokens, f, indent=2)
-        # Restrict permissions
+        _write_private(self.token_file, orjson.dumps(tokens, option=orjson.OPT_INDENT_2))
+        # New files are created 600; also tighten files from older versions
         self.token_file.chmod(0o600)
+        self._tokens_mtime = -1
     
     def device_code_login(self, client_id: str, tenant: str = 'consumers'):
         """
@@ -62,9 +102,14 @@ class AuthManager:
         
         scopes = "Mail.Read Mail.Send Calendars.ReadWrite Tasks.ReadWrite User.Read offline_access"
         
+        from outlook_cli.http import get_sync_http_client
+        
+        # One pooled client for the whole login so polls reuse the connection
+        http = get_sync_http_client()
+        
         # Step 1: Request device code
         click.echo("Requesting device code...")
-        response = requests.post(device_code_url, data={
+        response = http.post(device_code_url, data={
             'client_id': client_id,
             'scope': scopes
         })
@@ -73,7 +118,7 @@ class AuthManager:
             click.echo(f"Error: {response.text}", err=True)
             return False
         
-        device_data = response.json()
+        device_data = orjson.loads(response.content)
         device_code = device_data['device_code']
         user_code = device_data['user_code']
         verification_uri = device_data.get('verification_uri', 'https://microsoft.com/devicelogin')
@@ -90,21 +135,23 @@ class AuthManager:
         # Step 2: Poll for token
         start_time = time.time()
         while time.time() - start_time < expires_in:
-            time.sleep(interval)
-            
-            token_response = requests.post(token_url, data={
+            token_response = http.post(token_url, data={
                 'client_id': client_id,
                 'grant_type': 'urn:ietf:params:oauth:grant-type:device_code',
                 'device_code': device_code
             })
             
             if token_response.status_code == 200:
-                token_data = token_response.json()
+                token_data = orjson.loads(token_response.content)
                 
-                # Get user info
+                # Get user info, from token claims when available
                 access_token = token_data['access_token']
-                user_info = self._get_user_info(access_token)
-                email = user_info.get('mail') or user_info.get('userPrincipalName')
+                email = _email_from_jwt(access_token)
+                if email:
+                    user_info = {'userPrincipalName': email}
+                else:
+                    user_info = self._get_user_info(access_token)
+                    email = user_info.get('mail') or user_info.get('userPrincipalName')
                 
                 # Store tokens
                 tokens = self._load_tokens()
@@ -114,6 +161,7 @@ class AuthManager:
                     'access_token': access_token,
                     'refresh_token': token_data['refresh_token'],
                     'expires_at': time.time() + token_data['expires_in'],
+                    'expires_in': token_data['expires_in'],
                     'user_info': user_info
                 }
                 self._save_tokens(tokens)
@@ -121,9 +169,12 @@ class AuthManager:
                 click.echo(f"\n✓ Successfully authenticated as {email}")
                 return True
             
-            error_data = token_response.json()
+            error_data = orjson.loads(token_response.content)
             if error_data.get('error') == 'authorization_pending':
                 click.echo(".", nl=False)
+            elif error_data.get('error') == 'slow_down':
+                # RFC 8628: back off by 5 seconds for this and later polls
+                interval += 5
             elif error_data.get('error') == 'authorization_declined':
                 click.echo("\n✗ Authorization declined")
                 return False
@@ -133,21 +184,32 @@ class AuthManager:
             else:
                 click.echo(f"\nError: {error_data}", err=True)
                 return False
+            
+            time.sleep(interval)
         
         click.echo("\n✗ Timeout waiting for authorization")
         return False
     
     def _get_user_info(self, access_token: str):
         """Get user info from Microsoft Graph"""
-        response = requests.get(
+        from outlook_cli.http import get_sync_http_client
+        
+        response = get_sync_http_client().get(
             'https://graph.microsoft.com/v1.0/me',
             headers={'Authorization': f'Bearer {access_token}'}
         )
         if response.status_code == 200:
-            return response.json()
+            return orjson.loads(response.content)
         return {}
     
-    def get_access_token(self, email: str = None):
+    def resolve_account(self, email: str = None):
+        """Resolve an account email, defaulting to the first authenticated account"""
+        if email is not None:
+            return email
+        tokens = self._load_tokens()
+        return next(iter(tokens), None)
+    
+    async def get_access_token(self, email: str = None):
         """Get valid access token, refreshing if necessary"""
         tokens = self._load_tokens()
         
@@ -165,31 +227,52 @@ class AuthManager:
         
         account_data = tokens[email]
         
-        # Check if token needs refresh
-        if time.time() >= account_data['expires_at'] - 300:  # Refresh 5 min early
-            new_token = self._refresh_token(email, account_data)
-            if new_token:
-                return new_token
+        # Fast path: token still valid, no lock needed
+        if time.time() < account_data['expires_at'] - REFRESH_MARGIN:
+            return account_data['access_token']
+        
+        # Slow path: only one coroutine per account refreshes
+        lock = self._refresh_locks.setdefault(email, asyncio.Lock())
+        async with lock:
+            # Another coroutine may have refreshed while we waited
+            account_data = self._load_tokens()[email]
+            if time.time() < account_data['expires_at'] - REFRESH_MARGIN:
+                return account_data['access_token']
+            return await self._refresh_token(email, account_data)
+    
+    async def force_refresh(self, email: str = None, rejected_token: str = None):
+        """Refresh a token Graph rejected, even if it has not reached its expiry"""
+        email = self.resolve_account(email)
+        if email not in self._load_tokens():
             return None
         
-        return account_data['access_token']
+        lock = self._refresh_locks.setdefault(email, asyncio.Lock())
+        async with lock:
+            account_data = self._load_tokens()[email]
+            # Another coroutine may already have replaced the rejected token
+            if rejected_token and account_data['access_token'] != rejected_token:
+                return account_data['access_token']
+            return await self._refresh_token(email, account_data)
     
-    def _refresh_token(self, email: str, account_data: dict):
+    async def _refresh_token(self, email: str, account_data: dict):
         """Refresh access token"""
+        from outlook_cli.http import get_http_client
+        
         token_url = f"https://login.microsoftonline.com/{account_data['tenant']}/oauth2/v2.0/token"
         
-        response = requests.post(token_url, data={
+        response = await get_http_client().post(token_url, data={
             'client_id': account_data['client_id'],
             'grant_type': 'refresh_token',
             'refresh_token': account_data['refresh_token']
         })
         
         if response.status_code == 200:
-            token_data = response.json()
+            token_data = orjson.loads(response.content)
             
             tokens = self._load_tokens()
             tokens[email]['access_token'] = token_data['access_token']
             tokens[email]['expires_at'] = time.time() + token_data['expires_in']
+            tokens[email]['expires_in'] = token_data['expires_in']
             
             # Update refresh token if provided
             if 'refresh_token' in token_data:
@@ -201,8 +284,70 @@ class AuthManager:
             click.echo(f"Failed to refresh token: {response.text}", err=True)
             return None
     
+    def start_background_refresh(self, email: str = None):
+        """Refresh a token in the background once it is past half its lifetime"""
+        email = self.resolve_account(email)
+        account_data = self._load_tokens().get(email)
+        if account_data is None:
+            return
+        
+        lifetime = account_data.get('expires_in', DEFAULT_TOKEN_LIFETIME)
+        remaining = account_data['expires_at'] - time.time()
+        if remaining <= REFRESH_MARGIN:
+            # get_access_token refreshes in the foreground
+            return
+        
+        delay = remaining - lifetime * 0.5
+        if delay <= 0:
+            self._schedule_refresh(email)
+        else:
+            loop = asyncio.get_running_loop()
+            self._refresh_timers[email] = loop.call_later(delay, self._schedule_refresh, email)
+    
+    def _schedule_refresh(self, email: str):
+        """Start a background refresh task unless one is already running"""
+        self._refresh_timers.pop(email, None)
+        task = self._refresh_tasks.get(email)
+        if task is None or task.done():
+            self._refresh_tasks[email] = asyncio.ensure_future(self._background_refresh(email))
+    
+    async def _background_refresh(self, email: str):
+        """Refresh a token and schedule the next refresh"""
+        lock = self._refresh_locks.setdefault(email, asyncio.Lock())
+        async with lock:
+            account_data = self._load_tokens().get(email)
+            if account_data is None:
+                return
+            # Skip if another coroutine refreshed while we waited
+            lifetime = account_data.get('expires_in', DEFAULT_TOKEN_LIFETIME)
+            if account_data['expires_at'] - time.time() > lifetime * 0.5:
+                refreshed = True
+            else:
+                refreshed = await self._refresh_token(email, account_data)
+        
+        if refreshed:
+            self.start_background_refresh(email)
+    
+    async def stop_background_refresh(self):
+        """Cancel scheduled refreshes and wait for in-flight ones to be saved"""
+        for timer in self._refresh_timers.values():
+            timer.cancel()
+        self._refresh_timers.clear()
+        
+        tasks = [task for task in self._refresh_tasks.values() if not task.done()]
+        self._refresh_tasks.clear()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
     def logout(self):
-        """Clear all stored credentials"""
+        """Clear all stored credentials and cached Graph data"""
+        from outlook_cli.cache import CACHE_FILE, close_response_cache
+        
+        # Expired rows are only purged on the next open, which may never come
+        close_response_cache()
+        for name in (CACHE_FILE, CACHE_FILE + '-journal', TASKLIST_CACHE_FILE):
+            (self.config_dir / name).unlink(missing_ok=True)
+        
         if self.token_file.exists():
             self.token_file.unlink()
             click.echo("✓ Logged out successfully")
@@ -221,8 +366,10 @@ class AuthManager:
             expires = datetime.fromtimestamp(data['expires_at'])
             now = datetime.now()
             
-            if expires > now:
+            if expires - timedelta(seconds=REFRESH_MARGIN) > now:
                 status = f"Valid (expires {expires.strftime('%Y-%m-%d %H:%M')})"
+            elif expires > now:
+                status = "Expiring (refreshed on next use)"
             else:
                 status = "Expired"
             
@@ -0,0 +1,111 @@
+"""
+Response cache for read-mostly Graph API requests
+An in-memory LRU in front of a SQLite file shared across invocations
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+CACHE_FILE = "cache.sqlite"
+DEFAULT_TTL = 60  # Keep short - listings go stale quickly
+
+_cache = None
+
+def request_key(prefix, url, params=None):
+    """Identify a GET by a prefix (account or credentials), URL and query; params may be a dict or (key, value) pairs"""
+    if isinstance(params, dict):
+        params = params.items()
+    query = urlencode(sorted(params or ()))
+    return hashlib.blake2b(f'{prefix} {url}?{query}'.encode()).hexdigest()
+
+class TTLCache:
+    def __init__(self, path=None, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._db = None
+        
+        if path is not None:
+            # Listings include subjects and previews: keep the file owner-only,
+            # including files created by older versions
+            os.close(os.open(path, os.O_WRONLY | os.O_CREAT, 0o600))
+            os.chmod(path, 0o600)
+            self._db = sqlite3.connect(str(path))
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS responses '
+                '(key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value BLOB NOT NULL)'
+            )
+            self._db.execute('DELETE FROM responses WHERE expires_at <= ?', (time.time(),))
+            self._db.commit()
+    
+    def _remember(self, key, entry):
+        """Store an entry in memory, evicting the least recently used"""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def get(self, key):
+        """Get a cached value, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None and self._db is not None:
+            entry = self._db.execute(
+                'SELECT expires_at, value FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+        
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            self.delete(key)
+            return None
+        
+        self._remember(key, entry)
+        return entry[1]
+    
+    def set(self, key, value, ttl=DEFAULT_TTL):
+        """Cache a value for ttl seconds"""
+        entry = (time.time() + ttl, value)
+        self._remember(key, entry)
+        if self._db is not None:
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses (key, expires_at, value) VALUES (?, ?, ?)',
+                (key, entry[0], value)
+            )
+            self._db.commit()
+    
+    def delete(self, key):
+        """Drop a cached value"""
+        self._entries.pop(key, None)
+        if self._db is not None:
+            self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self._db.commit()
+    
+    def clear(self):
+        """Drop every cached value"""
+        self._entries.clear()
+        if self._db is not None:
+            self._db.execute('DELETE FROM responses')
+            self._db.commit()
+    
+    def close(self):
+        """Close the backing database"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+def get_response_cache(config_dir):
+    """Get the process-wide response cache"""
+    global _cache
+    if _cache is None:
+        _cache = TTLCache(config_dir / CACHE_FILE)
+    return _cache
+
+def close_response_cache():
+    """Close the process-wide response cache"""
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
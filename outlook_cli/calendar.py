@@ -2,60 +2,51 @@
 Calendar client for Microsoft Graph API
 """
 
-import requests
 from datetime import datetime
-from outlook_cli.auth import AuthManager
+import orjson
+from outlook_cli.graph import GraphClient, paginate
 
 GRAPH_BASE = "https://graph.microsoft.com/v1.0"
 
-class CalendarClient:
-    def __init__(self, config_dir, account=None):
-        self.auth = AuthManager(config_dir)
-        self.account = account
-        self.access_token = self.auth.get_access_token(account)
-        
-        if not self.access_token:
-            raise Exception("Not authenticated")
-    
-    def _headers(self):
-        return {
-            'Authorization': f'Bearer {self.access_token}',
-            'Content-Type': 'application/json'
-        }
-    
-    def list_events(self, start_time, end_time, calendar_id='primary'):
-        """List calendar events in a date range"""
+_EVENT_SELECT = 'id,subject,start,end,location,attendees,bodyPreview'
+_CALVIEW_URL = f"{GRAPH_BASE}/me/calendarView"
+
+class CalendarClient(GraphClient):
+    def list_events_request(self, start_time, end_time, calendar_id='primary'):
+        """Build the URL and query for listing calendar events in a date range"""
         if calendar_id == 'primary':
-            url = f"{GRAPH_BASE}/me/calendarView"
+            url = _CALVIEW_URL
         else:
             url = f"{GRAPH_BASE}/me/calendars/{calendar_id}/calendarView"
         
-        # Format times
+        # Format times - microseconds only add noise to the URL
         if isinstance(start_time, datetime):
-            start_str = start_time.isoformat()
+            start_str = start_time.isoformat(timespec='seconds')
         else:
             start_str = start_time
         
         if isinstance(end_time, datetime):
-            end_str = end_time.isoformat()
+            end_str = end_time.isoformat(timespec='seconds')
         else:
             end_str = end_time
         
-        params = {
-            'startDateTime': start_str,
-            'endDateTime': end_str,
-            '$orderby': 'start/dateTime',
-            '$select': 'id,subject,start,end,location,attendees,bodyPreview'
-        }
+        params = (
+            ('startDateTime', start_str),
+            ('endDateTime', end_str),
+            ('$orderby', 'start/dateTime'),
+            ('$select', _EVENT_SELECT)
+        )
         
-        response = requests.get(url, headers=self._headers(), params=params)
-        
-        if response.status_code == 200:
-            return response.json().get('value', [])
-        else:
-            raise Exception(f"Failed to list events: {response.text}")
+        return url, params
+    
+    async def list_events(self, start_time, end_time, calendar_id='primary', max_results=None):
+        """List calendar events in a date range"""
+        url, params = self.list_events_request(start_time, end_time, calendar_id)
+        async for event in paginate(self._get(url, params), self._get, max_results,
+                                    "Failed to list events"):
+            yield event
     
-    def create_event(self, summary, start_time, end_time, location=None, attendees=None):
+    async def create_event(self, summary, start_time, end_time, location=None, attendees=None):
         """Create a calendar event"""
         url = f"{GRAPH_BASE}/me/events"
         
@@ -77,14 +68,14 @@ class CalendarClient:
         if attendees:
             event['attendees'] = attendees
         
-        response = requests.post(url, headers=self._headers(), json=event)
+        response = await self._send('POST', url, json=event)
         
         if response.status_code == 201:
-            return response.json()
+            return orjson.loads(response.content)
         else:
             raise Exception(f"Failed to create event: {response.text}")
     
-    def update_event(self, event_id, **kwargs):
+    async def update_event(self, event_id, **kwargs):
         """Update a calendar event"""
         url = f"{GRAPH_BASE}/me/events/{event_id}"
         
@@ -98,25 +89,25 @@ class CalendarClient:
         if 'location' in kwargs:
             event['location'] = {'displayName': kwargs['location']}
         
-        response = requests.patch(url, headers=self._headers(), json=event)
+        response = await self._send('PATCH', url, json=event)
         
         if response.status_code == 200:
-            return response.json()
+            return orjson.loads(response.content)
         else:
             raise Exception(f"Failed to update event: {response.text}")
     
-    def delete_event(self, event_id):
+    async def delete_event(self, event_id):
         """Delete a calendar event"""
         url = f"{GRAPH_BASE}/me/events/{event_id}"
         
-        response = requests.delete(url, headers=self._headers())
+        response = await self._send('DELETE', url)
         
         if response.status_code == 204:
             return {'success': True}
         else:
             raise Exception(f"Failed to delete event: {response.text}")
     
-    def get_free_busy(self, start_time, end_time, attendees):
+    async def get_free_busy(self, start_time, end_time, attendees):
         """Get free/busy schedule"""
         url = f"{GRAPH_BASE}/me/calendar/getSchedule"
         
@@ -127,9 +118,9 @@ class CalendarClient:
             'availabilityViewInterval': 30
         }
         
-        response = requests.post(url, headers=self._headers(), json=data)
+        response = await self._authed_request('POST', url, json=data)
         
         if response.status_code == 200:
-            return response.json().get('value', [])
+            return orjson.loads(response.content).get('value', [])
         else:
             raise Exception(f"Failed to get schedule: {response.text}")
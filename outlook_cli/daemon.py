@@ -0,0 +1,171 @@
+"""
+Daemon mode for Outlook CLI
+A long-running process serves commands over a unix socket, so repeated
+invocations through outlook-fast skip importing click, httpx and the commands
+"""
+
+import io
+import orjson
+import os
+import socket
+import sys
+from pathlib import Path
+
+SOCKET_NAME = "outlook-cli.sock"
+
+# Reply frames: one channel byte, a 4-byte big-endian length, then the payload
+STDOUT = b'o'
+STDERR = b'e'
+EXIT = b'x'
+HEADER_SIZE = 5
+
+def socket_path():
+    """Get the daemon socket path, preferring the per-user runtime directory"""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return Path(runtime_dir) / SOCKET_NAME
+    return Path.home() / ".outlook-cli" / "daemon.sock"
+
+def _frame(channel: bytes, payload: bytes):
+    return channel + len(payload).to_bytes(4, 'big') + payload
+
+class _SocketStream(io.RawIOBase):
+    """Writable stream that forwards each write to the client as one frame"""
+    
+    def __init__(self, sock, channel: bytes):
+        self.sock = sock
+        self.channel = channel
+        self.connected = True
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        if self.connected and data:
+            try:
+                self.sock.sendall(_frame(self.channel, bytes(data)))
+            except OSError:
+                # Client went away; let the command finish without output
+                self.connected = False
+        return len(data)
+
+def _text_stream(sock, channel: bytes):
+    return io.TextIOWrapper(io.BufferedWriter(_SocketStream(sock, channel)),
+                            encoding='utf-8', line_buffering=True, write_through=True)
+
+def _run(cli, request, stdout, stderr):
+    """Run one command with its output sent to the client, returning the exit code"""
+    import traceback
+    
+    saved = sys.stdin, sys.stdout, sys.stderr
+    cwd = os.getcwd()
+    sys.stdin, sys.stdout, sys.stderr = io.StringIO(), stdout, stderr
+    try:
+        os.chdir(request.get('cwd') or cwd)
+        cli.main(args=request['argv'], prog_name='outlook')
+        return 0
+    except SystemExit as e:
+        # click's standalone mode always ends in sys.exit
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+    finally:
+        stdout.flush()
+        stderr.flush()
+        sys.stdin, sys.stdout, sys.stderr = saved
+        os.chdir(cwd)
+
+def serve():
+    """Serve commands on the unix socket until interrupted"""
+    import socketserver
+    import click
+    from outlook_cli.main import cli
+    
+    if not hasattr(socket, 'AF_UNIX'):
+        raise click.ClickException("Daemon mode needs unix sockets, which this platform lacks")
+    
+    path = socket_path()
+    if path.exists():
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(path))
+        except OSError:
+            path.unlink()  # Left behind by a daemon that did not shut down cleanly
+        else:
+            raise click.ClickException(f"A daemon is already listening on {path}")
+        finally:
+            probe.close()
+    
+    class Handler(socketserver.BaseRequestHandler):
+        def handle(self):
+            data = self.request.makefile('rb').read()
+            if not data:
+                return  # Liveness probe from serve()
+            request = orjson.loads(data)
+            stdout = _text_stream(self.request, STDOUT)
+            stderr = _text_stream(self.request, STDERR)
+            code = _run(cli, request, stdout, stderr)
+            try:
+                self.request.sendall(_frame(EXIT, str(code).encode()))
+            except OSError:
+                pass
+    
+    # Commands swap sys.stdout and the working directory, so serve one at a time
+    path.parent.mkdir(parents=True, exist_ok=True)
+    old_umask = os.umask(0o177)  # Socket is created 600: it acts with the stored tokens
+    try:
+        server = socketserver.UnixStreamServer(str(path), Handler)
+    finally:
+        os.umask(old_umask)
+    
+    click.echo(f"Listening on {path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        path.unlink(missing_ok=True)
+
+def _read_exact(reader, size: int):
+    data = reader.read(size)
+    if data is None or len(data) < size:
+        raise EOFError
+    return data
+
+def main():
+    """Run the outlook command through the daemon, or in-process if none is running"""
+    from outlook_cli._cli_entry import main as run_local
+    
+    if not hasattr(socket, 'AF_UNIX'):
+        return run_local()  # No unix sockets on Windows, so no daemon
+    
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(socket_path()))
+    except OSError:
+        sock.close()
+        return run_local()
+    
+    with sock:
+        sock.sendall(orjson.dumps({'argv': sys.argv[1:], 'cwd': os.getcwd()}))
+        sock.shutdown(socket.SHUT_WR)
+        
+        outputs = {STDOUT: sys.stdout.buffer, STDERR: sys.stderr.buffer}
+        reader = sock.makefile('rb')
+        try:
+            while True:
+                header = _read_exact(reader, HEADER_SIZE)
+                channel, size = header[:1], int.from_bytes(header[1:], 'big')
+                payload = _read_exact(reader, size)
+                if channel == EXIT:
+                    return int(payload)
+                outputs[channel].write(payload)
+                outputs[channel].flush()
+        except EOFError:
+            sys.stderr.write("Error: outlook daemon closed the connection\n")
+            return 1
@@ -2,52 +2,42 @@
 Email client for Microsoft Graph API
 """
 
-import requests
-from outlook_cli.auth import AuthManager
+import orjson
+from outlook_cli.graph import GraphBatch, GraphClient, paginate
 
 GRAPH_BASE = "https://graph.microsoft.com/v1.0"
 
-class EmailClient:
-    def __init__(self, config_dir, account=None):
-        self.auth = AuthManager(config_dir)
-        self.account = account
-        self.access_token = self.auth.get_access_token(account)
-        
-        if not self.access_token:
-            raise Exception("Not authenticated")
-    
-    def _headers(self):
-        return {
-            'Authorization': f'Bearer {self.access_token}',
-            'Content-Type': 'application/json'
-        }
-    
-    def list_messages(self, max_results=10, folder='inbox'):
-        """List emails from a folder"""
-        folder_map = {
-            'inbox': 'inbox',
-            'sent': 'sentitems',
-            'drafts': 'drafts',
-            'deleted': 'deleteditems'
-        }
-        
-        folder_id = folder_map.get(folder.lower(), folder)
+_FOLDER_MAP = {
+    'inbox': 'inbox',
+    'sent': 'sentitems',
+    'drafts': 'drafts',
+    'deleted': 'deleteditems'
+}
+_LIST_SELECT = 'id,subject,from,receivedDateTime,bodyPreview,isRead'
+_SEARCH_SELECT = 'id,subject,from,receivedDateTime,bodyPreview'
+
+class EmailClient(GraphClient):
+    def list_messages_request(self, max_results=10, folder='inbox'):
+        """Build the URL and query for listing emails from a folder"""
+        folder_id = _FOLDER_MAP.get(folder.lower(), folder)
         url = f"{GRAPH_BASE}/me/mailFolders/{folder_id}/messages"
         
         params = {
             '$top': max_results,
             '$orderby': 'receivedDateTime desc',
-            '$select': 'id,subject,from,receivedDateTime,bodyPreview,isRead'
+            '$select': _LIST_SELECT
         }
         
-        response = requests.get(url, headers=self._headers(), params=params)
-        
-        if response.status_code == 200:
-            return response.json().get('value', [])
-        else:
-            raise Exception(f"Failed to list messages: {response.text}")
+        return url, params
+    
+    async def list_messages(self, max_results=10, folder='inbox'):
+        """List emails from a folder"""
+        url, params = self.list_messages_request(max_results, folder)
+        async for message in paginate(self._get(url, params), self._get, max_results,
+                                      "Failed to list messages"):
+            yield message
     
-    def search(self, query, max_results=10):
+    async def search(self, query, max_results=10):
         """Search emails"""
         url = f"{GRAPH_BASE}/me/messages"
         
@@ -55,29 +45,41 @@ class EmailClient:
         # Microsoft Graph supports $search parameter
         params = {
             '$top': max_results,
-            '$select': 'id,subject,from,receivedDateTime,bodyPreview',
+            '$select': _SEARCH_SELECT,
             '$search': f'"{query}"'
         }
         
-        response = requests.get(url, headers=self._headers(), params=params)
+        response = await self._get(url, params)
         
         if response.status_code == 200:
-            return response.json().get('value', [])
+            return orjson.loads(response.content).get('value', [])
         else:
             raise Exception(f"Failed to search messages: {response.text}")
     
-    def get_message(self, message_id):
+    async def get_message(self, message_id):
         """Get full message details"""
+        raw = b''.join([chunk async for chunk in self.stream_message(message_id)])
+        return orjson.loads(raw)
+    
+    async def stream_message(self, message_id):
+        """Stream the raw JSON of a full message"""
         url = f"{GRAPH_BASE}/me/messages/{message_id}"
         
-        response = requests.get(url, headers=self._headers())
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            raise Exception(f"Failed to get message: {response.text}")
+        for attempt in range(2):
+            async with self.client.stream('GET', url, headers=self._cached_headers) as response:
+                # Same one-shot 401 retry as _authed_request
+                if response.status_code == 401 and attempt == 0 and await self._reauthenticate():
+                    continue
+                
+                if response.status_code != 200:
+                    await response.aread()
+                    raise Exception(f"Failed to get message: {response.text}")
+                
+                async for chunk in response.aiter_bytes():
+                    yield chunk
+                return
     
-    def send_message(self, to_email, subject, body, body_type='Text'):
+    async def send_message(self, to_email, subject, body, body_type='Text'):
         """Send an email"""
         url = f"{GRAPH_BASE}/me/sendMail"
         
@@ -98,14 +100,14 @@ class EmailClient:
             }
         }
         
-        response = requests.post(url, headers=self._headers(), json=message)
+        response = await self._send('POST', url, json=message)
         
         if response.status_code == 202:
             return {'success': True}
         else:
             raise Exception(f"Failed to send message: {response.text}")
     
-    def create_draft(self, to_email, subject, body, body_type='Text'):
+    async def create_draft(self, to_email, subject, body, body_type='Text'):
         """Create a draft message"""
         url = f"{GRAPH_BASE}/me/messages"
         
@@ -124,20 +126,38 @@ class EmailClient:
             ]
         }
         
-        response = requests.post(url, headers=self._headers(), json=message)
+        response = await self._send('POST', url, json=message)
         
         if response.status_code == 201:
-            return response.json()
+            return orjson.loads(response.content)
         else:
             raise Exception(f"Failed to create draft: {response.text}")
     
-    def delete_message(self, message_id):
+    async def delete_message(self, message_id):
         """Delete a message"""
         url = f"{GRAPH_BASE}/me/messages/{message_id}"
         
-        response = requests.delete(url, headers=self._headers())
+        response = await self._send('DELETE', url)
         
         if response.status_code == 204:
             return {'success': True}
         else:
             raise Exception(f"Failed to delete message: {response.text}")
+    
+    async def delete_messages(self, message_ids):
+        """Delete several messages using $batch, returning {message_id: error or None}"""
+        batch = GraphBatch(self)
+        # Batch ids are positions; message ids are long and only need to come back out
+        for i, message_id in enumerate(message_ids):
+            batch.add(i, 'DELETE', f"{GRAPH_BASE}/me/messages/{message_id}")
+        
+        results = await batch.execute()
+        
+        errors = {}
+        for i, message_id in enumerate(message_ids):
+            result = results.get(str(i), {})
+            if result.get('status') == 204:
+                errors[message_id] = None
+            else:
+                errors[message_id] = result.get('body', {}).get('error', {}).get('message', 'No response')
+        return errors
@@ -0,0 +1,174 @@
+"""
+Shared helpers for Microsoft Graph API requests
+"""
+
+import asyncio
+import httpx
+import orjson
+from urllib.parse import quote, urlencode
+
+from outlook_cli.cache import DEFAULT_TTL, get_response_cache, request_key
+from outlook_cli.http import get_coalesced, get_http_client
+
+GRAPH_BASE = "https://graph.microsoft.com/v1.0"
+BATCH_LIMIT = 20  # Graph accepts at most 20 requests per $batch
+
+class GraphClient:
+    """Base for Graph API clients: auth headers, 401 retry, and response caching"""
+    
+    def __init__(self, auth, account, access_token, cache=None, use_cache=True):
+        self.auth = auth
+        self.account = account
+        self.cache = cache
+        self.use_cache = use_cache  # False only bypasses reads; writes still clear the cache
+        self.client = get_http_client()
+        self._cached_headers = {'Content-Type': 'application/json'}
+        self._set_token(access_token)
+    
+    @classmethod
+    async def create(cls, auth, account=None, use_cache=True):
+        """Create an authenticated client sharing the given AuthManager"""
+        access_token = await auth.get_access_token(account)
+        
+        if not access_token:
+            raise Exception("Not authenticated")
+        
+        return cls(auth, account, access_token, get_response_cache(auth.config_dir), use_cache)
+    
+    def _set_token(self, access_token):
+        self.access_token = access_token
+        self._cached_headers['Authorization'] = f'Bearer {access_token}'
+    
+    async def _reauthenticate(self):
+        """Replace a token Graph rejected; returns False if it could not be refreshed"""
+        access_token = await self.auth.force_refresh(self.account, self.access_token)
+        if not access_token:
+            return False
+        self._set_token(access_token)
+        return True
+    
+    async def _request(self, method, url, **kwargs):
+        """Send a request, coalescing identical concurrent GETs"""
+        if method == 'GET':
+            return await get_coalesced(url, kwargs.get('params'), self._cached_headers)
+        return await self.client.request(method, url, headers=self._cached_headers, **kwargs)
+    
+    async def _authed_request(self, method, url, **kwargs):
+        """Send a request, refreshing the token and retrying once on 401"""
+        response = await self._request(method, url, **kwargs)
+        if response.status_code == 401 and await self._reauthenticate():
+            response = await self._request(method, url, **kwargs)
+        return response
+    
+    async def _get(self, url, params=None):
+        """GET a URL, serving successful responses from the cache when possible"""
+        if self.cache is None or not self.use_cache:
+            return await self._authed_request('GET', url, params=params)
+        
+        key = request_key(self.auth.resolve_account(self.account), url, params)
+        content = self.cache.get(key)
+        if content is not None:
+            return httpx.Response(200, content=content, request=httpx.Request('GET', url))
+        
+        response = await self._authed_request('GET', url, params=params)
+        if response.status_code == 200:
+            self.cache.set(key, response.content, DEFAULT_TTL)
+        return response
+    
+    async def _send(self, method, url, **kwargs):
+        """Send a request; GETs go through the cache and anything else clears it"""
+        if method == 'GET':
+            return await self._get(url, kwargs.get('params'))
+        if self.cache is not None:
+            self.cache.clear()
+        return await self._authed_request(method, url, **kwargs)
+
+class GraphBatch:
+    """Send several Graph requests in $batch calls instead of one round-trip each"""
+    
+    def __init__(self, client):
+        self.client = client
+        self._requests = []
+    
+    def add(self, request_id, method, url, params=None, body=None):
+        """Queue a request; url is absolute as used by the clients"""
+        relative_url = url[len(GRAPH_BASE):] if url.startswith(GRAPH_BASE) else url
+        if params:
+            relative_url += '?' + urlencode(params, safe="$/,'", quote_via=quote)
+        
+        request = {'id': str(request_id), 'method': method, 'url': relative_url}
+        if body is not None:
+            request['body'] = body
+            request['headers'] = {'Content-Type': 'application/json'}
+        self._requests.append(request)
+    
+    async def execute(self):
+        """Send the queued requests, returning {request_id: {'status', 'body', ...}}"""
+        requests, self._requests = self._requests, []
+        writes = any(request['method'] != 'GET' for request in requests)
+        
+        results = {}
+        for i in range(0, len(requests), BATCH_LIMIT):
+            content = orjson.dumps({'requests': requests[i:i + BATCH_LIMIT]})
+            if writes:
+                response = await self.client._send('POST', f"{GRAPH_BASE}/$batch", content=content)
+            else:
+                response = await self.client._authed_request('POST', f"{GRAPH_BASE}/$batch", content=content)
+            
+            if response.status_code != 200:
+                raise Exception(f"Failed to send batch: {response.text}")
+            
+            for result in orjson.loads(response.content).get('responses', []):
+                results[result['id']] = result
+        return results
+
+async def batch_values(client, result, max_results=None, error="Request failed"):
+    """Get the items of a batched GET result, fetching any later pages through client"""
+    if result is None or result.get('status') != 200:
+        body = result.get('body') if result else None
+        raise Exception(f"{error}: {body}")
+    
+    page = result.get('body', {})
+    items = page.get('value', [])[:max_results]
+    next_link = page.get('@odata.nextLink')
+    if next_link and (max_results is None or len(items) < max_results):
+        remaining = None if max_results is None else max_results - len(items)
+        items += await collect(paginate(client._get(next_link), client._get, remaining, error))
+    return items
+
+async def paginate(request, get_next, max_results=None, error="Request failed"):
+    """
+    Yield items across @odata.nextLink pages, starting from the response
+    of the awaitable `request` and fetching later pages with `get_next(url)`
+    The next page is requested as soon as the current one arrives, so it
+    downloads while the caller is still consuming items
+    """
+    pending = asyncio.ensure_future(request)
+    count = 0
+    try:
+        while pending is not None:
+            response = await pending
+            pending = None
+            
+            if response.status_code != 200:
+                raise Exception(f"{error}: {response.text}")
+            
+            page = orjson.loads(response.content)
+            items = page.get('value', [])
+            next_link = page.get('@odata.nextLink')
+            if next_link and (max_results is None or count + len(items) < max_results):
+                # nextLink already carries the original query parameters
+                pending = asyncio.ensure_future(get_next(next_link))
+            
+            for item in items:
+                if max_results is not None and count >= max_results:
+                    return
+                yield item
+                count += 1
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+async def collect(items):
+    """Gather an async iterator of items into a list"""
+    return [item async for item in items]
@@ -0,0 +1,54 @@
+"""
+Shared HTTP client for Outlook CLI
+Keeps one keepalive connection pool per process
+"""
+
+import asyncio
+import httpx
+
+from outlook_cli.cache import request_key
+
+_client = None
+_sync_client = None
+_inflight = {}  # request key -> future shared by identical concurrent GETs
+
+def get_http_client():
+    """Get the process-wide async HTTP client"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            timeout=30
+        )
+    return _client
+
+async def close_http_client():
+    """Close the process-wide async HTTP client"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+async def get_coalesced(url, params=None, headers=None):
+    """GET a URL, sharing one in-flight request among identical concurrent callers"""
+    key = request_key((headers or {}).get('Authorization', ''), url, params)
+    future = _inflight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(get_http_client().get(url, params=params, headers=headers))
+        _inflight[key] = future
+        
+        def forget(done):
+            if _inflight.get(key) is done:
+                del _inflight[key]
+        future.add_done_callback(forget)
+    
+    # Shield so one cancelled caller does not cancel the request for the others
+    return await asyncio.shield(future)
+
+def get_sync_http_client():
+    """Get the process-wide sync HTTP client for code outside the event loop"""
+    global _sync_client
+    if _sync_client is None or _sync_client.is_closed:
+        _sync_client = httpx.Client(http2=True, timeout=30)
+    return _sync_client
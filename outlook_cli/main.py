@@ -3,33 +3,74 @@
 Outlook CLI - Microsoft Graph CLI for Outlook email, calendar, and tasks
 """
 
+# PEP 810: on Python 3.15+ these imports load on first use; older
+# interpreters ignore the name. orjson is only needed for --json-output
+__lazy_modules__ = ["orjson"]
+
 import click
-import json
+import functools
+import orjson
 import os
 import sys
 from pathlib import Path
 from datetime import datetime, timedelta
 
-from outlook_cli.auth import AuthManager
-from outlook_cli.email import EmailClient
-from outlook_cli.calendar import CalendarClient
-from outlook_cli.tasks import TasksClient
+from outlook_cli import __version__
+
+# AuthManager, the Graph clients, httpx, and keyring are imported inside the
+# commands that use them, so --help and shell completion only pay for click
 
 CONFIG_DIR = Path.home() / ".outlook-cli"
 CONFIG_FILE = CONFIG_DIR / "config.json"
 
+def get_auth(ctx):
+    """Get the invocation's AuthManager, creating it on first use"""
+    if 'auth' not in ctx.obj:
+        from outlook_cli.auth import AuthManager
+        
+        # Ensure config directory exists
+        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        
+        # One AuthManager per invocation, shared by every client
+        ctx.obj['auth'] = AuthManager(CONFIG_DIR)
+    return ctx.obj['auth']
+
+def run_async(f):
+    """Run an async command to completion, closing the shared HTTP client in the same loop"""
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        import asyncio
+        from outlook_cli.cache import close_response_cache
+        from outlook_cli.http import close_http_client
+        
+        ctx = click.get_current_context()
+        
+        async def runner():
+            # Refresh an aging token while the command runs
+            auth_manager = get_auth(ctx)
+            auth_manager.start_background_refresh(ctx.obj.get('account'))
+            try:
+                return await f(*args, **kwargs)
+            finally:
+                await auth_manager.stop_background_refresh()
+                await close_http_client()
+                close_response_cache()
+        return asyncio.run(runner())
+    return wrapper
+
 @click.group()
+@click.version_option(__version__, '--version', '-V', prog_name='outlook')
 @click.option('--account', '-a', help='Account email to use')
 @click.option('--json-output', '-j', is_flag=True, help='Output as JSON')
+@click.option('--no-cache', is_flag=True, help='Bypass the short-lived response cache')
 @click.pass_context
-def cli(ctx, account, json_output):
+def cli(ctx, account, json_output, no_cache):
     """Outlook CLI - Microsoft Graph API client for email, calendar, and tasks"""
+    # Commands build the AuthManager through get_auth, so --help never loads it
     ctx.ensure_object(dict)
     ctx.obj['account'] = account
     ctx.obj['json_output'] = json_output
-    
-    # Ensure config directory exists
-    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    ctx.obj['use_cache'] = not no_cache
 
 @cli.group()
 def auth():
@@ -39,28 +80,28 @@ def auth():
 @auth.command()
 @click.option('--client-id', required=True, help='Azure AD Application Client ID')
 @click.option('--tenant', default='consumers', help='Tenant ID (default: consumers for personal accounts)')
-def login(client_id, tenant):
+@click.pass_context
+def login(ctx, client_id, tenant):
     """Authenticate using device code flow"""
-    auth_manager = AuthManager(CONFIG_DIR)
-    auth_manager.device_code_login(client_id, tenant)
+    get_auth(ctx).device_code_login(client_id, tenant)
 
 @auth.command()
-def logout():
+@click.pass_context
+def logout(ctx):
     """Logout and clear stored credentials"""
-    auth_manager = AuthManager(CONFIG_DIR)
-    auth_manager.logout()
+    get_auth(ctx).logout()
 
 @auth.command()
-def status():
+@click.pass_context
+def status(ctx):
     """Check authentication status"""
-    auth_manager = AuthManager(CONFIG_DIR)
-    auth_manager.status()
+    get_auth(ctx).status()
 
 @auth.command()
-def list():
+@click.pass_context
+def list(ctx):
     """List authenticated accounts"""
-    auth_manager = AuthManager(CONFIG_DIR)
-    auth_manager.list_accounts()
+    get_auth(ctx).list_accounts()
 
 @cli.group()
 @click.pass_context
@@ -72,28 +113,35 @@ def email(ctx):
 @click.option('--max', '-m', default=10, help='Maximum number of emails to list')
 @click.option('--folder', '-f', default='inbox', help='Folder to list (default: inbox)')
 @click.pass_context
-def list(ctx, max, folder):
+@run_async
+async def list(ctx, max, folder):
     """List emails"""
-    client = EmailClient(CONFIG_DIR, ctx.obj.get('account'))
+    from outlook_cli.email import EmailClient
+    from outlook_cli.graph import collect
+    
+    client = await EmailClient.create(get_auth(ctx), ctx.obj.get('account'), ctx.obj['use_cache'])
     emails = client.list_messages(max_results=max, folder=folder)
     
     if ctx.obj.get('json_output'):
-        click.echo(json.dumps(emails, indent=2))
+        click.echo(orjson.dumps(await collect(emails), option=orjson.OPT_INDENT_2).decode())
     else:
-        for msg in emails:
+        async for msg in emails:
             click.echo(f"[{msg['receivedDateTime']}] {msg['from']['emailAddress']['name']}: {msg['subject']}")
 
 @email.command()
 @click.argument('query')
 @click.option('--max', '-m', default=10, help='Maximum results')
 @click.pass_context
-def search(ctx, query, max):
+@run_async
+async def search(ctx, query, max):
     """Search emails"""
-    client = EmailClient(CONFIG_DIR, ctx.obj.get('account'))
-    emails = client.search(query, max_results=max)
+    from outlook_cli.email import EmailClient
+    
+    client = await EmailClient.create(get_auth(ctx), ctx.obj.get('account'), ctx.obj['use_cache'])
+    emails = await client.search(query, max_results=max)
     
     if ctx.obj.get('json_output'):
-        click.echo(json.dumps(emails, indent=2))
+        click.echo(orjson.dumps(emails, option=orjson.OPT_INDENT_2).decode())
     else:
         for msg in emails:
             click.echo(f"[{msg['receivedDateTime']}] {msg['from']['emailAddress']['name']}: {msg['subject']}")
@@ -104,35 +152,66 @@ def search(ctx, query, max):
 @click.option('--body', '-b', required=True, help='Email body')
 @click.option('--body-file', '-f', type=click.File('r'), help='Read body from file')
 @click.pass_context
-def send(ctx, to, subject, body, body_file):
+@run_async
+async def send(ctx, to, subject, body, body_file):
     """Send an email"""
+    from outlook_cli.email import EmailClient
+    
     if body_file:
         body = body_file.read()
     
-    client = EmailClient(CONFIG_DIR, ctx.obj.get('account'))
-    result = client.send_message(to, subject, body)
+    client = await EmailClient.create(get_auth(ctx), ctx.obj.get('account'), ctx.obj['use_cache'])
+    result = await client.send_message(to, subject, body)
     
     if ctx.obj.get('json_output'):
-        click.echo(json.dumps(result, indent=2))
+        click.echo(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
     else:
         click.echo("✓ Email sent successfully")
 
 @email.command()
 @click.argument('message_id')
 @click.pass_context
-def get(ctx, message_id):
+@run_async
+async def get(ctx, message_id):
     """Get email details"""
-    client = EmailClient(CONFIG_DIR, ctx.obj.get('account'))
-    msg = client.get_message(message_id)
+    from outlook_cli.email import EmailClient
+    
+    client = await EmailClient.create(get_auth(ctx), ctx.obj.get('account'), ctx.obj['use_cache'])
     
     if ctx.obj.get('json_output'):
-        click.echo(json.dumps(msg, indent=2))
+        # Pass Graph's JSON straight through without parsing it
+        out = sys.stdout.buffer
+        async for chunk in client.stream_message(message_id):
+            out.write(chunk)
+        out.write(b'\n')
+        out.flush()
     else:
+        msg = await client.get_message(message_id)
         click.echo(f"From: {msg['from']['emailAddress']['name']} <{msg['from']['emailAddress']['address']}>")
         click.echo(f"Subject: {msg['subject']}")
         click.echo(f"Date: {msg['receivedDateTime']}")
         click.echo(f"\n{msg.get('body', {}).get('content', 'No content')}")
 
+@email.command(name='delete-many')
+@click.argument('message_ids', nargs=-1, required=True)
+@click.pass_context
+@run_async
+async def delete_many(ctx, message_ids):
+    """Delete several emails, 20 per request"""
+    from outlook_cli.email import EmailClient
+    
+    client = await EmailClient.create(get_auth(ctx), ctx.obj.get('account'), ctx.obj['use_cache'])
+    errors = await client.delete_messages(message_ids)
+    
+    if ctx.obj.get('json_output'):
+        click.echo(orjson.dumps(errors, option=orjson.OPT_INDENT_2).decode())
+    else:
+        for message_id, error in errors.items():
+            if error:
+                click.echo(f"✗ {message_id}: {error}", err=True)
+        deleted = sum(1 for error in errors.values() if error is None)
+        click.echo(f"✓ Deleted {deleted} of {len(errors)} emails")
+
 @cli.group()
 @click.pass_context
 def calendar(ctx):
@@ -143,9 +222,13 @@ def calendar(ctx):
 @click.option('--today', is_flag=True, help='Show today\'s events')
 @click.option('--days', '-d', default=7, help='Number of days to show')
 @click.pass_context
-def list(ctx, today, days):
+@run_async
+async def list(ctx, today, days):
     """List calendar events"""
-    client = CalendarClient(CONFIG_DIR, ctx.obj.get('account'))
+    from outlook_cli.calendar import CalendarClient
+    from outlook_cli.graph import collect
+    
+    client = await CalendarClient.create(get_auth(ctx), ctx.obj.get('account'), ctx.obj['use_cache'])
     
     if today:
         start = datetime.now().replace(hour=0, minute=0, second=0)
@@ -157,9 +240,9 @@ def list(ctx, today, days):
     events = client.list_events(start, end)
     
     if ctx.obj.get('json_output'):
-        click.echo(json.dumps(events, indent=2))
+        click.echo(orjson.dumps(await collect(events), option=orjson.OPT_INDENT_2).decode())
     else:
-        for event in events:
+        async for event in events:
             start = event['start'].get('dateTime', event['start'].get('date'))
             click.echo(f"[{start}] {event['subject']}")
 
@@ -170,19 +253,22 @@ def list(ctx, today, days):
 @click.option('--location', '-l', help='Event location')
 @click.option('--attendees', '-a', help='Comma-separated attendee emails')
 @click.pass_context
-def create(ctx, summary, start_time, end_time, location, attendees):
+@run_async
+async def create(ctx, summary, start_time, end_time, location, attendees):
     """Create a calendar event"""
-    client = CalendarClient(CONFIG_DIR, ctx.obj.get('account'))
+    from outlook_cli.calendar import CalendarClient
+    
+    client = await CalendarClient.create(get_auth(ctx), ctx.obj.get('account'), ctx.obj['use_cache'])
     
     attendee_list = []
     if attendees:
         attendee_list = [{'emailAddress': {'address': email.strip()}, 'type': 'required'} 
                         for email in attendees.split(',')]
     
-    result = client.create_event(summary, start_time, end_time, location, attendee_list)
+    result = await client.create_event(summary, start_time, end_time, location, attendee_list)
     
     if ctx.obj.get('json_output'):
-        click.echo(json.dumps(result, indent=2))
+        click.echo(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
     else:
         click.echo(f"✓ Event created: {result['id']}")
 
@@ -195,15 +281,19 @@ def tasks(ctx):
 @tasks.command()
 @click.option('--list-name', default='Tasks', help='Task list name')
 @click.pass_context
-def lists(ctx, list_name):
+@run_async
+async def lists(ctx, list_name):
     """List tasks"""
-    client = TasksClient(CONFIG_DIR, ctx.obj.get('account'))
+    from outlook_cli.tasks import TasksClient
+    from outlook_cli.graph import collect
+    
+    client = await TasksClient.create(get_auth(ctx), ctx.obj.get('account'), ctx.obj['use_cache'])
     items = client.list_tasks(list_name)
     
     if ctx.obj.get('json_output'):
-        click.echo(json.dumps(items, indent=2))
+        click.echo(orjson.dumps(await collect(items), option=orjson.OPT_INDENT_2).decode())
     else:
-        for item in items:
+        async for item in items:
             status = "✓" if item['status'] == 'completed' else "○"
             click.echo(f"{status} {item['title']}")
 
@@ -211,15 +301,82 @@ def lists(ctx, list_name):
 @click.option('--title', '-t', required=True, help='Task title')
 @click.option('--list-name', default='Tasks', help='Task list name')
 @click.pass_context
-def create(ctx, title, list_name):
+@run_async
+async def create(ctx, title, list_name):
     """Create a task"""
-    client = TasksClient(CONFIG_DIR, ctx.obj.get('account'))
-    result = client.create_task(title, list_name)
+    from outlook_cli.tasks import TasksClient
+    
+    client = await TasksClient.create(get_auth(ctx), ctx.obj.get('account'), ctx.obj['use_cache'])
+    result = await client.create_task(title, list_name)
     
     if ctx.obj.get('json_output'):
-        click.echo(json.dumps(result, indent=2))
+        click.echo(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
     else:
         click.echo(f"✓ Task created: {result['id']}")
 
+@cli.command()
+@click.option('--max', '-m', default=10, help='Maximum number of recent emails to check for unread')
+@click.option('--list-name', default='Tasks', help='Task list name')
+@click.pass_context
+@run_async
+async def agenda(ctx, max, list_name):
+    """Show today's events, unread email, and open tasks"""
+    import asyncio
+    from outlook_cli.email import EmailClient
+    from outlook_cli.calendar import CalendarClient
+    from outlook_cli.tasks import TasksClient
+    from outlook_cli.graph import GraphBatch, batch_values, collect
+    
+    auth_manager = get_auth(ctx)
+    account = ctx.obj.get('account')
+    email_client, cal_client, tasks_client = await asyncio.gather(
+        EmailClient.create(auth_manager, account, ctx.obj['use_cache']),
+        CalendarClient.create(auth_manager, account, ctx.obj['use_cache']),
+        TasksClient.create(auth_manager, account, ctx.obj['use_cache'])
+    )
+    
+    start = datetime.now().replace(hour=0, minute=0, second=0)
+    end = start + timedelta(days=1)
+    
+    # All three listings in a single $batch round-trip
+    batch = GraphBatch(email_client)
+    batch.add('emails', 'GET', *email_client.list_messages_request(max_results=max))
+    batch.add('events', 'GET', *cal_client.list_events_request(start, end))
+    batch.add('tasks', 'GET', *await tasks_client.list_tasks_request(list_name))
+    results = await batch.execute()
+    
+    # The batch carries each listing's first page; batch_values fetches the rest
+    emails, events = await asyncio.gather(
+        batch_values(email_client, results.get('emails'), max, "Failed to list messages"),
+        batch_values(cal_client, results.get('events'), error="Failed to list events")
+    )
+    if results.get('tasks', {}).get('status') == 404:
+        # Cached task list id went stale; list_tasks re-resolves it
+        items = await collect(tasks_client.list_tasks(list_name))
+    else:
+        items = await batch_values(tasks_client, results.get('tasks'), error="Failed to list tasks")
+    unread = [msg for msg in emails if not msg.get('isRead')]
+    
+    if ctx.obj.get('json_output'):
+        click.echo(orjson.dumps({'events': events, 'unread': unread, 'tasks': items}, option=orjson.OPT_INDENT_2).decode())
+    else:
+        click.echo("Events:")
+        for event in events:
+            event_start = event['start'].get('dateTime', event['start'].get('date'))
+            click.echo(f"  [{event_start}] {event['subject']}")
+        click.echo("Unread email:")
+        for msg in unread:
+            click.echo(f"  [{msg['receivedDateTime']}] {msg['from']['emailAddress']['name']}: {msg['subject']}")
+        click.echo("Tasks:")
+        for item in items:
+            click.echo(f"  ○ {item['title']}")
+
+@cli.command()
+def daemon():
+    """Serve commands to outlook-fast over a unix socket"""
+    from outlook_cli.daemon import serve
+    
+    serve()
+
 if __name__ == '__main__':
     cli()
@@ -2,48 +2,85 @@
 Tasks client for Microsoft Graph API
 """
 
-import requests
-from outlook_cli.auth import AuthManager
+import orjson
+import time
+from outlook_cli.auth import TASKLIST_CACHE_FILE, _write_private
+from outlook_cli.graph import GraphClient, paginate
 
 GRAPH_BASE = "https://graph.microsoft.com/v1.0"
+TASKLIST_CACHE_TTL = 86400  # Task list ids essentially never change
 
-class TasksClient:
-    def __init__(self, config_dir, account=None):
-        self.auth = AuthManager(config_dir)
-        self.account = account
-        self.access_token = self.auth.get_access_token(account)
-        
-        if not self.access_token:
-            raise Exception("Not authenticated")
+class TasksClient(GraphClient):
+    def _load_list_cache(self):
+        """Load cached task list ids"""
+        cache_file = self.auth.config_dir / TASKLIST_CACHE_FILE
+        if cache_file.exists():
+            return orjson.loads(cache_file.read_bytes())
+        return {}
     
-    def _headers(self):
-        return {
-            'Authorization': f'Bearer {self.access_token}',
-            'Content-Type': 'application/json'
-        }
+    def _save_list_cache(self, cache):
+        """Save cached task list ids"""
+        cache_file = self.auth.config_dir / TASKLIST_CACHE_FILE
+        _write_private(cache_file, orjson.dumps(cache, option=orjson.OPT_INDENT_2))
+        cache_file.chmod(0o600)
     
-    def _get_task_list_id(self, list_name='Tasks'):
-        """Get task list ID by name"""
+    def _cached_task_list_id(self, list_name):
+        """Get a task list ID from the cache, or None if missing or stale"""
+        account = self.auth.resolve_account(self.account)
+        entry = self._load_list_cache().get(account, {}).get(list_name)
+        if entry and time.time() - entry['cached_at'] < TASKLIST_CACHE_TTL:
+            return entry['id']
+        return None
+    
+    async def _fetch_task_list_id(self, list_name):
+        """Look up a task list ID from Graph and refresh the cache"""
         url = f"{GRAPH_BASE}/me/todo/lists"
         
-        response = requests.get(url, headers=self._headers())
-        
-        if response.status_code == 200:
-            lists = response.json().get('value', [])
-            for task_list in lists:
-                if task_list['displayName'] == list_name:
-                    return task_list['id']
-            # Return first list if name not found
-            if lists:
-                return lists[0]['id']
+        response = await self._authed_request('GET', url)
+        
+        if response.status_code != 200:
+            raise Exception(f"Task list '{list_name}' not found")
+        
+        lists = orjson.loads(response.content).get('value', [])
+        ids_by_name = {task_list['displayName']: task_list['id'] for task_list in lists}
+        list_id = ids_by_name.get(list_name)
+        # Fall back to first list if name not found
+        if list_id is None:
+            if not lists:
+                raise Exception(f"Task list '{list_name}' not found")
+            list_id = lists[0]['id']
+        
+        # Every list came back in one response, so replace the account's map:
+        # deleted lists drop out, and a name that fell back to the first list
+        # is not cached, so creating it later works
+        cached_at = time.time()
+        cache = self._load_list_cache()
+        cache[self.auth.resolve_account(self.account)] = {
+            name: {'id': task_list_id, 'cached_at': cached_at}
+            for name, task_list_id in ids_by_name.items()
+        }
+        self._save_list_cache(cache)
         
-        raise Exception(f"Task list '{list_name}' not found")
+        return list_id
     
-    def list_tasks(self, list_name='Tasks', include_completed=False):
-        """List tasks from a task list"""
-        list_id = self._get_task_list_id(list_name)
-        url = f"{GRAPH_BASE}/me/todo/lists/{list_id}/tasks"
+    async def _get_task_list_id(self, list_name='Tasks'):
+        """Get task list ID by name"""
+        return self._cached_task_list_id(list_name) or await self._fetch_task_list_id(list_name)
+    
+    async def _list_request(self, method, list_name, path='', **kwargs):
+        """Send a request under a task list, re-resolving a stale cached list ID once"""
+        cached_id = self._cached_task_list_id(list_name)
+        list_id = cached_id or await self._fetch_task_list_id(list_name)
+        response = await self._send(method, f"{GRAPH_BASE}/me/todo/lists/{list_id}/tasks{path}", **kwargs)
+        
+        if response.status_code == 404 and cached_id:
+            list_id = await self._fetch_task_list_id(list_name)
+            response = await self._send(method, f"{GRAPH_BASE}/me/todo/lists/{list_id}/tasks{path}", **kwargs)
         
+        return response
+    
+    def _list_tasks_params(self, include_completed=False):
+        """Build the query for listing tasks"""
         params = {
             '$orderby': 'createdDateTime desc'
         }
@@ -51,18 +88,21 @@ class TasksClient:
         if not include_completed:
             params['$filter'] = "status ne 'completed'"
         
-        response = requests.get(url, headers=self._headers(), params=params)
-        
-        if response.status_code == 200:
-            return response.json().get('value', [])
-        else:
-            raise Exception(f"Failed to list tasks: {response.text}")
+        return params
+    
+    async def list_tasks_request(self, list_name='Tasks', include_completed=False):
+        """Build the URL and query for listing tasks from a task list"""
+        list_id = await self._get_task_list_id(list_name)
+        return f"{GRAPH_BASE}/me/todo/lists/{list_id}/tasks", self._list_tasks_params(include_completed)
     
-    def create_task(self, title, list_name='Tasks', due_date=None):
+    async def list_tasks(self, list_name='Tasks', include_completed=False, max_results=None):
+        """List tasks from a task list"""
+        request = self._list_request('GET', list_name, params=self._list_tasks_params(include_completed))
+        async for task in paginate(request, self._get, max_results, "Failed to list tasks"):
+            yield task
+    
+    async def create_task(self, title, list_name='Tasks', due_date=None):
         """Create a task"""
-        list_id = self._get_task_list_id(list_name)
-        url = f"{GRAPH_BASE}/me/todo/lists/{list_id}/tasks"
-        
         task = {
             'title': title
         }
@@ -73,18 +113,15 @@ class TasksClient:
                 'timeZone': 'UTC'
             }
         
-        response = requests.post(url, headers=self._headers(), json=task)
+        response = await self._list_request('POST', list_name, json=task)
         
         if response.status_code == 201:
-            return response.json()
+            return orjson.loads(response.content)
         else:
             raise Exception(f"Failed to create task: {response.text}")
     
-    def update_task(self, task_id, list_name='Tasks', **kwargs):
+    async def update_task(self, task_id, list_name='Tasks', **kwargs):
         """Update a task"""
-        list_id = self._get_task_list_id(list_name)
-        url = f"{GRAPH_BASE}/me/todo/lists/{list_id}/tasks/{task_id}"
-        
         task = {}
         if 'title' in kwargs:
             task['title'] = kwargs['title']
@@ -96,23 +133,20 @@ class TasksClient:
                 'timeZone': 'UTC'
             }
         
-        response = requests.patch(url, headers=self._headers(), json=task)
+        response = await self._list_request('PATCH', list_name, f"/{task_id}", json=task)
         
         if response.status_code == 200:
-            return response.json()
+            return orjson.loads(response.content)
         else:
             raise Exception(f"Failed to update task: {response.text}")
     
-    def complete_task(self, task_id, list_name='Tasks'):
+    async def complete_task(self, task_id, list_name='Tasks'):
         """Mark a task as completed"""
-        return self.update_task(task_id, list_name, status='completed')
+        return await self.update_task(task_id, list_name, status='completed')
     
-    def delete_task(self, task_id, list_name='Tasks'):
+    async def delete_task(self, task_id, list_name='Tasks'):
         """Delete a task"""
-        list_id = self._get_task_list_id(list_name)
-        url = f"{GRAPH_BASE}/me/todo/lists/{list_id}/tasks/{task_id}"
-        
-        response = requests.delete(url, headers=self._headers())
+        response = await self._list_request('DELETE', list_name, f"/{task_id}")
         
         if response.status_code == 204:
             return {'success': True}